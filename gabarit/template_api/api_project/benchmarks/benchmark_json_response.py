@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright (C) <2018-2022>  <Agence Data Services, DSI Pôle Emploi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Compare NumpyJSONResponse and FastNumpyJSONResponse on probability matrices
+
+Usage : python benchmarks/benchmark_json_response.py --rows 1000 --classes 300
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from {{package_name}}.routers.schemas.functional import FastNumpyJSONResponse, NumpyJSONResponse
+
+
+def get_payloads(nb_rows: int, nb_classes: int) -> dict:
+    """Create typical prediction payloads"""
+    rng = np.random.default_rng(42)
+    probas = rng.dirichlet(np.ones(nb_classes), size=nb_rows)
+    payloads = {
+        "float64 matrix": probas,
+        "float32 matrix": probas.astype(np.float32),
+        "transposed matrix": probas.T,
+        "longdouble matrix": probas.astype(np.longdouble),
+        "list of dicts": [{"probas": row, "best": np.int64(row.argmax())} for row in probas],
+    }
+    try:
+        import pandas as pd
+        payloads["DataFrame"] = pd.DataFrame(probas, columns=[f"class_{i}" for i in range(nb_classes)])
+    except ImportError:
+        pass
+    return payloads
+
+
+def benchmark(response_class: type, payload, number: int) -> float:
+    """Return the mean rendering time in milliseconds or NaN if the payload is not supported"""
+    try:
+        response_class(payload)
+    except TypeError:
+        return float("nan")
+    return timeit.timeit(lambda: response_class(payload), number=number) / number * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Number of rows of the probability matrices")
+    parser.add_argument("--classes", type=int, default=300, help="Number of classes")
+    parser.add_argument("--number", type=int, default=20, help="Number of renderings per measure")
+    args = parser.parse_args()
+
+    print(f"{'payload':<20}{'NumpyJSONResponse':>20}{'FastNumpyJSONResponse':>24}{'speedup':>10}")
+    for name, payload in get_payloads(args.rows, args.classes).items():
+        default_ms = benchmark(NumpyJSONResponse, payload, args.number)
+        fast_ms = benchmark(FastNumpyJSONResponse, payload, args.number)
+        speedup = default_ms / fast_ms
+        print(f"{name:<20}{default_ms:>17.2f} ms{fast_ms:>21.2f} ms{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
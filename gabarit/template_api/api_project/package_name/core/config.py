@@ -30,6 +30,25 @@ class Settings(BaseSettings):
     api_entrypoint: str = "/{{package_name}}/rs/v1"
     log_level: str = "INFO"
 
+    # Inferences run outside of the event loop in a pool of threads or processes
+    inference_executor: str = "thread"
+    inference_workers: int = 1
+    inference_max_queue: int = 64
+
+    # JSON encoder of the functional routes : "default" or "fast"
+    response_encoder: str = "default"
+
+    # Prometheus metrics about inferences (disabled by default)
+    metrics_enabled: bool = False
+
+    # Number of inputs predicted at once by the /predict/batch route
+    batch_chunk_size: int = 1000
+
+    # Micro-batching of the /predict route (disabled by default)
+    batching_enabled: bool = False
+    batching_max_size: int = 32
+    batching_max_wait_ms: float = 5.0
+
     model_config = SettingsConfigDict(env_file=".env", extra='ignore', protected_namespaces=('settings', ))
 
 
@@ -0,0 +1,145 @@
+# Copyright (C) <2018-2022>  <Agence Data Services, DSI Pôle Emploi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Inference executor
+
+This module is used to run blocking model inferences (predict, explain_as_json, etc.)
+outside of the event loop so that the application keeps answering other requests
+(liveness and readiness probes for example) during long inferences.
+
+Two kinds of executors are available (INFERENCE_EXECUTOR setting) :
+- thread : inferences run in a thread pool and share the model loaded at startup ;
+- process : inferences run in a process pool, each process loading its own model.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any
+
+from .metrics import count_request, set_inflight
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+# Model loaded by each worker of a process pool
+_WORKER_MODEL = None
+
+
+class ExecutorBusyError(Exception):
+    """Raised when too many inferences are already pending"""
+
+
+def _init_worker(model_cls: type) -> None:
+    """Load a model in a process of the pool"""
+    global _WORKER_MODEL
+    _WORKER_MODEL = model_cls()
+    _WORKER_MODEL.loading()
+    logger.info("Model loaded in inference process")
+
+
+def _call_worker_model(method: str, *args, **kwargs) -> Any:
+    """Call a method of the model loaded in a process of the pool"""
+    return getattr(_WORKER_MODEL, method)(*args, **kwargs)
+
+
+class InferenceExecutor:
+    """Run model methods in a thread or process pool with bounded concurrency
+
+    At most max_workers inferences run at the same time and at most max_queue_size
+    inferences wait for a free worker. Beyond that, an ExecutorBusyError is raised
+    so that the application can answer with an HTTP 503 error.
+    """
+
+    def __init__(self, kind: str = EXECUTOR_THREAD, max_workers: int = 1, max_queue_size: int = 64):
+        if kind not in (EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor kind '{kind}' (must be '{EXECUTOR_THREAD}' or '{EXECUTOR_PROCESS}')")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._model = None
+        self._executor: Executor = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of inferences running or waiting for a worker"""
+        return self._pending
+
+    @property
+    def is_busy(self) -> bool:
+        """True if a new inference would be rejected"""
+        return self._pending >= self.max_workers + self.max_queue_size
+
+    def start(self, model) -> None:
+        """Create the pool
+
+        With a process pool, each process loads its own instance of the model class
+        """
+        self._model = model
+        if self.kind == EXECUTOR_PROCESS:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 initargs=(type(model),))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        logger.info(f"Inference executor started ({self.kind}, {self.max_workers} workers)")
+
+    def stop(self) -> None:
+        """Shutdown the pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def run(self, method: str, *args, **kwargs) -> Any:
+        """Run a method of the model in the pool and wait for its result
+
+        Raises:
+            ExecutorBusyError: If max_workers + max_queue_size inferences are already pending
+        """
+        if self.is_busy:
+            count_request(method, "busy")
+            raise ExecutorBusyError(f"{self._pending} inferences are already pending")
+
+        if self.kind == EXECUTOR_PROCESS:
+            func = partial(_call_worker_model, method, *args, **kwargs)
+        else:
+            func = partial(getattr(self._model, method), *args, **kwargs)
+
+        self._pending += 1
+        set_inflight(self._pending)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, func)
+        except Exception:
+            count_request(method, "error")
+            raise
+        else:
+            count_request(method, "success")
+            return result
+        finally:
+            self._pending -= 1
+            set_inflight(self._pending)
+
+    async def run_when_free(self, method: str, *args, poll_interval: float = 0.05, **kwargs) -> Any:
+        """Same as run but wait for the executor not to be busy instead of raising an error
+
+        Used by long running requests (batch predictions) that prefer waiting to failing
+        """
+        while self.is_busy:
+            await asyncio.sleep(poll_interval)
+        return await self.run(method, *args, **kwargs)
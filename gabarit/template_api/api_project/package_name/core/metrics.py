@@ -0,0 +1,91 @@
+# Copyright (C) <2018-2022>  <Agence Data Services, DSI Pôle Emploi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""Inference metrics
+
+This module defines Prometheus metrics about inferences that are exposed on the /metrics
+technical route when METRICS_ENABLED is set :
+- inference_stage_duration_seconds : histograms of the duration of each stage of a request
+  (parse, dataframe, inference, explanation, serialization) ;
+- inference_requests_total : number of inferences by method and status ;
+- inference_requests_inflight : number of inferences running or waiting for a worker.
+
+Metrics are only created when first used so that nothing is imported nor recorded when
+they are disabled. Use stage_timer to time your own stages :
+
+    with stage_timer("my_stage"):
+        ...
+
+With a process executor, stages running in the inference processes are not recorded.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Iterator, Tuple, Union
+
+from .config import settings
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_METRICS = {}
+
+
+def get_metrics() -> dict:
+    """Create the Prometheus metrics on first call and return them"""
+    if not _METRICS:
+        from prometheus_client import Counter, Gauge, Histogram
+
+        _METRICS["stage_duration"] = Histogram("inference_stage_duration_seconds",
+                                               "Duration of each stage of a request",
+                                               ["stage"], buckets=STAGE_BUCKETS)
+        _METRICS["requests"] = Counter("inference_requests_total", "Number of inferences",
+                                       ["method", "status"])
+        _METRICS["inflight"] = Gauge("inference_requests_inflight",
+                                     "Number of inferences running or waiting for a worker")
+    return _METRICS
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Record the duration of a stage if metrics are enabled"""
+    if not settings.metrics_enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics()["stage_duration"].labels(stage).observe(time.perf_counter() - start)
+
+
+def count_request(method: str, status: str) -> None:
+    """Count an inference if metrics are enabled"""
+    if settings.metrics_enabled:
+        get_metrics()["requests"].labels(method, status).inc()
+
+
+def set_inflight(value: Union[int, float]) -> None:
+    """Set the number of inflight inferences if metrics are enabled"""
+    if settings.metrics_enabled:
+        get_metrics()["inflight"].set(value)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the Prometheus exposition of all the metrics and its content type"""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -24,13 +24,24 @@ so they can handle requests.
 
 To use your own model instead of the base model, create a module in {{package_name}}.model
 such as model_awesome.py and import it as Model instead of the one used here.
+
+An InferenceExecutor is also started at startup so that the inferences run outside
+of the event loop (see {{package_name}}.core.executor).
+
+If BATCHING_ENABLED is set, a PredictionBatcher is also started at startup. It coalesces
+concurrent /predict requests into a single call to the predict method of your model.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Any, List, Set, Tuple
 
 from fastapi import FastAPI
 
+from .config import settings
+from .executor import InferenceExecutor
+
 {%- if gabarit_package_spec %}
 from ..model.model_gabarit import ModelGabarit as Model
 {%- else %}
@@ -41,6 +52,127 @@ logger = logging.getLogger(__name__)
 
 RESOURCES = {}
 RESOURCE_MODEL = "model"
+RESOURCE_BATCHER = "batcher"
+RESOURCE_EXECUTOR = "executor"
+
+
+class PredictionBatcher:
+    """Coalesce concurrent predictions into a single call to model.predict
+
+    Requests are queued and a background task gathers them until max_batch_size items
+    are pending or max_wait_ms milliseconds have passed since the first one. The
+    contents of the gathered requests are concatenated, predicted at once and the
+    predictions are scattered back to each caller.
+
+    Only requests whose body is {"content": [...]} can be batched : the model must
+    return one prediction per element of content.
+
+    If an executor is given, batches are predicted in its pool instead of the event loop.
+    """
+
+    def __init__(self, model: Model, executor: InferenceExecutor = None, max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def accepts(body: dict) -> bool:
+        """Check if a request body can be batched"""
+        return isinstance(body, dict) and set(body) == {"content"} and isinstance(body["content"], list)
+
+    async def start(self) -> None:
+        """Start the background task that handles the queue"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+    async def predict(self, content: list) -> Any:
+        """Queue a content and wait for its predictions"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((content, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Gather queued requests into batches and process them"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            batch_size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while batch_size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                batch_size += len(item[0])
+
+            # Batches are processed concurrently, the executor bounds the concurrency
+            task = asyncio.create_task(self._process(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _predict(self, content: list) -> Any:
+        """Predict a content with the executor if any"""
+        if self.executor is not None:
+            return await self.executor.run("predict", content=content)
+        return self.model.predict(content=content)
+
+    async def _process(self, batch: List[Tuple[list, asyncio.Future]]) -> None:
+        """Predict a batch and set the result of each request future"""
+        # A lone request is predicted as is to keep the exact unbatched behavior
+        if len(batch) == 1:
+            content, future = batch[0]
+            try:
+                prediction = await self._predict(content)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(prediction)
+            return
+
+        merged_content = [element for content, _ in batch for element in content]
+        try:
+            predictions = await self._predict(merged_content)
+            if len(predictions) != len(merged_content):
+                raise ValueError(f"The model returned {len(predictions)} predictions "
+                                 f"for {len(merged_content)} inputs")
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        logger.debug(f"Batch of {len(batch)} requests ({len(merged_content)} inputs) predicted")
+        offset = 0
+        for content, future in batch:
+            if not future.done():
+                future.set_result(predictions[offset:offset + len(content)])
+            offset += len(content)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -50,8 +182,26 @@ async def lifespan(app: FastAPI):
     logger.info("Model loaded")
 
     RESOURCES[RESOURCE_MODEL] = model
+
+    # Start the executor that runs the inferences outside of the event loop
+    executor = InferenceExecutor(kind=settings.inference_executor, max_workers=settings.inference_workers,
+                                 max_queue_size=settings.inference_max_queue)
+    executor.start(model)
+    RESOURCES[RESOURCE_EXECUTOR] = executor
+
+    # Start the micro-batcher if enabled
+    if settings.batching_enabled:
+        batcher = PredictionBatcher(model, executor=executor, max_batch_size=settings.batching_max_size,
+                                    max_wait_ms=settings.batching_max_wait_ms)
+        await batcher.start()
+        RESOURCES[RESOURCE_BATCHER] = batcher
+        logger.info("Prediction batcher started")
+
     yield
 
     # Clean up the ML models and release the resources
+    if RESOURCE_BATCHER in RESOURCES:
+        await RESOURCES[RESOURCE_BATCHER].stop()
+    executor.stop()
     RESOURCES.clear()
 
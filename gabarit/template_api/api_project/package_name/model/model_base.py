@@ -32,6 +32,8 @@ from pathlib import Path
 from typing import Any, Tuple, Union, ClassVar
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from ..core.metrics import stage_timer
+
 
 class ModelSettings(BaseSettings):
     """Download settings
@@ -82,15 +84,18 @@ class Model:
 
     def predict(self, *args, **kwargs):
         """Make a prediction thanks to the model"""
-        return self._model.predict(*args, **kwargs)
+        with stage_timer("inference"):
+            return self._model.predict(*args, **kwargs)
 
     def explain_as_json(self, *args, **kwargs) -> Union[dict, list]:
         """Compute explanations about a prediction and return a JSON serializable object"""
-        return self._model_explainer.explain_instance_as_json(*args, **kwargs)
+        with stage_timer("explanation"):
+            return self._model_explainer.explain_instance_as_json(*args, **kwargs)
 
     def explain_as_html(self, *args, **kwargs) -> str:
         """Compute explanations about a prediction and return an HTML report"""
-        return self._model_explainer.explain_instance_as_html(*args, **kwargs)
+        with stage_timer("explanation"):
+            return self._model_explainer.explain_instance_as_html(*args, **kwargs)
 
     def _load_model(self, **kwargs) -> None:
         """Load a model from a file
@@ -43,6 +43,7 @@ from typing import Any, Union, ClassVar
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from .model_base import Model
+from ..core.metrics import stage_timer
 
 {%- if gabarit_package_spec %}
 try:
@@ -108,31 +109,39 @@ class ModelGabarit(Model):
         super().__init__(*args, **kwargs)
 
     def predict(self, content: Any, *args, **kwargs) -> Any:
-        """Make a prediction by calling utils_models.predict with the loaded model"""
+        """Make a prediction by calling utils_models.predict with the loaded model
+
+        The DataFrame construction and utils_models.predict (preprocessing and model
+        inference) are timed as the "dataframe" and "inference" stages
+        """
         if isinstance(content, list) or isinstance(content, dict):
-            content = pd.DataFrame(content)
+            with stage_timer("dataframe"):
+                content = pd.DataFrame(content)
 
         # For APIs, we default to alternative_version = True
         # It uses `tf.function` and `model.__call__` which is way faster for low number of inputs
         # It also prevents some memory issues with newest version of TensorFlow
         # https://github.com/tensorflow/tensorflow/issues/58676
         # You can change the inference batch size if it doesn't suit your model/project
-        return utils_models.predict(content, model=self._model, model_conf=self._model_conf,
-                                    inference_batch_size=128, alternative_version=True, **kwargs)
+        with stage_timer("inference"):
+            return utils_models.predict(content, model=self._model, model_conf=self._model_conf,
+                                        inference_batch_size=128, alternative_version=True, **kwargs)
 
     def explain_as_json(self, content: Any, *args, **kwargs) -> Union[dict, list]:
         """Compute explanations about a prediction and return a JSON serializable object"""
         if isinstance(content, list) or isinstance(content, dict):
             content = pd.DataFrame(content)
 
-        return self._model_explainer.explain_instance_as_json(content, *args, **kwargs)
+        with stage_timer("explanation"):
+            return self._model_explainer.explain_instance_as_json(content, *args, **kwargs)
 
     def explain_as_html(self, content: Any, *args, **kwargs) -> str:
         """Compute explanations about a prediction and return an HTML report"""
         if isinstance(content, list) or isinstance(content, dict):
             content = pd.DataFrame(content)
 
-        return self._model_explainer.explain_instance_as_html(content, *args, **kwargs)
+        with stage_timer("explanation"):
+            return self._model_explainer.explain_instance_as_html(content, *args, **kwargs)
 
     def _load_model(self, **kwargs) -> None:
         """Load a model in a gabarit fashion"""
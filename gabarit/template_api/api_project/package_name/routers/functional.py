@@ -15,20 +15,39 @@
 
 
 import json
-from typing import Union
+import logging
+from typing import Any, AsyncIterator, Union
 
+import numpy as np
 from fastapi import APIRouter
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, Response
+from starlette.responses import HTMLResponse, Response, StreamingResponse
 
-from ..model.model_base import Model
-from .schemas.functional import NumpyJSONResponse
-from ..core.resources import RESOURCES, RESOURCE_MODEL
+from .schemas.functional import get_json_response_class, iter_csv_chunks, iter_lines, iter_ndjson_chunks, render_json
+from ..core.config import settings
+from ..core.executor import ExecutorBusyError, InferenceExecutor
+from ..core.metrics import stage_timer
+from ..core.resources import RESOURCES, RESOURCE_BATCHER, RESOURCE_EXECUTOR, PredictionBatcher
+
+logger = logging.getLogger(__name__)
 
 # Functional router
 router = APIRouter()
 
 
+def busy_response(media_type: str = "application/json") -> Response:
+    """Return a 503 HTTP error when too many inferences are pending
+
+    See https://developer.mozilla.org/fr/docs/Web/HTTP/Status/503
+    """
+    error_msg = "Too many pending inferences, retry later"
+    if media_type == "application/json":
+        content = json.dumps({"error": {"code": 503, "message": error_msg}})
+    else:
+        content = error_msg
+    return Response(content=content, status_code=503, media_type=media_type)
+
+
 # This function is async since it uses starlette Request
 # There is no return type annotation because starting from FastAPI 0.89, type annotations are
 # interpreted as response_model and response_model must be valid pydantic. Since we use here a
@@ -41,8 +60,8 @@ async def predict(request: Request):
     know what data your model is expecting.
     See https://fastapi.tiangolo.com/advanced/using-request-directly/ for more infos.
 
-    We also use a custom starlette JSONResponse class (NumpyJSONResponse)
-    instead of pydantic for the same reasons
+    We also use a custom starlette JSONResponse class (NumpyJSONResponse or FastNumpyJSONResponse
+    depending on the RESPONSE_ENCODER setting) instead of pydantic for the same reasons
 
     For a cleaner way to handle requests and reponses you should use pydantic as stated in FastAPI
     doc : https://fastapi.tiangolo.com/tutorial/body/#create-your-data-model
@@ -50,15 +69,81 @@ async def predict(request: Request):
     You can use routes from {{package_name}}.routers.technical as examples of how to create requests and
     responses schemas thanks to pydantic or have a look at the FastAPI documentation :
     https://fastapi.tiangolo.com/tutorial/response-model/
+
+    The prediction runs in the inference executor (see {{package_name}}.core.executor) and
+    a 503 HTTP error is returned if too many inferences are already pending.
+
+    If the micro-batching is enabled (BATCHING_ENABLED setting), requests like {"content": [...]}
+    are coalesced with concurrent ones before being predicted
     """
-    model: Model = RESOURCES.get(RESOURCE_MODEL)
+    executor: InferenceExecutor = RESOURCES.get(RESOURCE_EXECUTOR)
+    batcher: PredictionBatcher = RESOURCES.get(RESOURCE_BATCHER)
 
     body = await request.body()
-    body = json.loads(body) if body else {}
+    with stage_timer("parse"):
+        body = json.loads(body) if body else {}
+
+    try:
+        if batcher is not None and batcher.accepts(body):
+            prediction = await batcher.predict(body["content"])
+        else:
+            prediction = await executor.run("predict", **body)
+    except ExecutorBusyError:
+        return busy_response()
+
+    with stage_timer("serialization"):
+        return get_json_response_class()(prediction)
+
+def as_prediction_list(predictions: Any, nb_inputs: int) -> list:
+    """Return the predictions of a content as a list with one prediction per input
 
-    prediction = model.predict(**body)
+    Some models return a single prediction instead of a list when there is only one input
+    """
+    if isinstance(predictions, (list, np.ndarray)) and len(predictions) == nb_inputs:
+        return list(predictions)
+    if nb_inputs == 1:
+        return [predictions]
+    raise ValueError(f"The model returned {len(predictions)} predictions for {nb_inputs} inputs")
+
+
+# There is no return type annotation because starting from FastAPI 0.89, type annotations are
+# interpreted as response_model and response_model must be valid pydantic. Since we use here a
+# startlette.Response we remove return annotation (cf. https://fastapi.tiangolo.com/release-notes/#0890)
+@router.post("/predict/batch")
+async def predict_batch(request: Request, chunk_size: int = settings.batch_chunk_size):
+    """Batch predict route that streams predictions of a large NDJSON or CSV body
+
+    The body is read as a stream and split into chunks of chunk_size inputs that are
+    predicted one after the other so that the memory stays bounded whatever the size
+    of the body :
+    - with a Content-Type: text/csv header, the body is a CSV file with a header line and
+    each record is an input (a dict) ;
+    - otherwise, the body is a NDJSON file (one JSON input per line).
+
+    Predictions are streamed back as NDJSON, one line per input in the same order as the
+    inputs. Since the status code is sent with the first predictions, an error occurring
+    later is reported in a last line like {"error": {"code": 500, "message": "..."}}.
+    """
+    executor: InferenceExecutor = RESOURCES.get(RESOURCE_EXECUTOR)
+
+    lines = iter_lines(request.stream())
+    if request.headers.get("Content-Type", "").startswith("text/csv"):
+        chunks = iter_csv_chunks(lines, chunk_size)
+    else:
+        chunks = iter_ndjson_chunks(lines, chunk_size)
+
+    async def predict_chunks() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in chunks:
+                predictions = await executor.run_when_free("predict", content=chunk)
+                yield b"".join(render_json(prediction) + b"\n"
+                               for prediction in as_prediction_list(predictions, len(chunk)))
+        except Exception as exc:
+            logger.exception("Error during a batch prediction")
+            yield render_json({"error": {"code": 500, "message": str(exc)}}) + b"\n"
+
+    return StreamingResponse(predict_chunks(), media_type="application/x-ndjson")
 
-    return NumpyJSONResponse(prediction)
 
 # This function is async since it uses starlette Request
 # There is no return type annotation because starting from FastAPI 0.89, type annotations are
@@ -84,17 +169,23 @@ async def explain(request: Request):
 
     If there is not explainer or the explainer does not implement explain_as_json or explain_as_html
     we return a 501 HTTP error : https://developer.mozilla.org/fr/docs/Web/HTTP/Status/501
+
+    As for predictions, explanations run in the inference executor and a 503 HTTP error is
+    returned if too many inferences are already pending.
     """
-    model: Model = RESOURCES.get(RESOURCE_MODEL)
+    executor: InferenceExecutor = RESOURCES.get(RESOURCE_EXECUTOR)
 
     body = await request.body()
-    body = json.loads(body) if body else {}
+    with stage_timer("parse"):
+        body = json.loads(body) if body else {}
 
     # JSON repsonse (when Accept: application/json in the request)
     if request.headers.get("Accept") == "application/json":
         try:
-            explanation_json = model.explain_as_json(**body)
+            explanation_json = await executor.run("explain_as_json", **body)
 
+        except ExecutorBusyError:
+            return busy_response()
         except (AttributeError, NotImplementedError):
             error_msg = {
                 "error": {
@@ -108,13 +199,16 @@ async def explain(request: Request):
                 media_type='application/json',
             )
         else:
-            return NumpyJSONResponse(explanation_json)
+            with stage_timer("serialization"):
+                return get_json_response_class()(explanation_json)
 
     # HTML repsonse (otherwise)
     else:
         try:
-            explanation_html = model.explain_as_html(**body)
+            explanation_html = await executor.run("explain_as_html", **body)
 
+        except ExecutorBusyError:
+            return busy_response(media_type="text/plain")
         except (AttributeError, NotImplementedError):
             return Response(
                 content="No explainer capable of handling explicability",
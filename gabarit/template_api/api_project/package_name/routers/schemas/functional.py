@@ -16,16 +16,68 @@
 
 """Functional schemas"""
 
-from typing import Any
+import csv
+import io
+from typing import Any, AsyncIterator, List, Type
 
 import numpy as np
 import orjson
 from starlette.responses import JSONResponse
 
+from ...core.config import settings
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+RESPONSE_ENCODER_DEFAULT = "default"
+RESPONSE_ENCODER_FAST = "fast"
+
+FAST_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
 
 class NumpyJSONResponse(JSONResponse):
     def render(self, content: Any) -> bytes:
-        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY, default=default)
+        return render_default(content)
+
+
+class FastNumpyJSONResponse(JSONResponse):
+    """JSONResponse that lets orjson serialize numpy and pandas objects without
+    converting them to python objects whenever it is possible
+
+    If the content can not be serialized, it falls back to NumpyJSONResponse.render
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_fast(content)
+
+
+def get_json_response_class() -> Type[JSONResponse]:
+    """Return the JSONResponse class selected by the RESPONSE_ENCODER setting"""
+    if settings.response_encoder == RESPONSE_ENCODER_FAST:
+        return FastNumpyJSONResponse
+    return NumpyJSONResponse
+
+
+def render_default(content: Any) -> bytes:
+    """Serialize a content with orjson and the default encoder"""
+    return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY, default=default)
+
+
+def render_fast(content: Any) -> bytes:
+    """Serialize a content with orjson and the fast encoder, fall back to the default one"""
+    try:
+        return orjson.dumps(content, option=FAST_OPTIONS, default=fast_default)
+    except TypeError:
+        return render_default(content)
+
+
+def render_json(content: Any) -> bytes:
+    """Serialize a content with the encoder selected by the RESPONSE_ENCODER setting"""
+    if settings.response_encoder == RESPONSE_ENCODER_FAST:
+        return render_fast(content)
+    return render_default(content)
 
 
 def default(obj):
@@ -35,8 +87,98 @@ def default(obj):
         return obj.tolist()
     elif hasattr(obj, "dtype") and hasattr(obj, "astype") and hasattr(obj, "tolist"):
         if np.issubdtype(obj.dtype, np.integer):
-            return obj.astype(int).tolist()
+            return obj.astype(int, copy=False).tolist()
         elif np.issubdtype(obj.dtype, np.number):
-            return obj.astype(float).tolist()
+            return obj.astype(float, copy=False).tolist()
 
     raise TypeError
+
+
+def fast_default(obj):
+    """Convert objects orjson can not serialize natively
+
+    orjson serializes C-contiguous numpy arrays of native types by itself, so arrays are
+    converted to such arrays instead of python lists when possible.
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in "biuf" and not obj.flags.c_contiguous:
+            return np.ascontiguousarray(obj)
+        elif obj.dtype.kind == "f" and obj.dtype.itemsize > 8:
+            return obj.astype(np.float64)
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return float(obj) if obj.dtype.kind == "f" else obj.item()
+    elif isinstance(obj, set):
+        return list(obj)
+    elif pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            return obj.to_dict(orient="records")
+        elif isinstance(obj, (pd.Series, pd.Index)):
+            return obj.to_numpy()
+
+    raise TypeError
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of bytes into decoded lines (without line terminators)"""
+    buffer = b""
+    async for data in stream:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode("utf-8")
+    if buffer:
+        yield buffer.rstrip(b"\r").decode("utf-8")
+
+
+async def iter_ndjson_chunks(lines: AsyncIterator[str], chunk_size: int) -> AsyncIterator[list]:
+    """Group NDJSON lines into chunks of at most chunk_size decoded objects"""
+    chunk = []
+    async for line in lines:
+        if not line.strip():
+            continue
+        chunk.append(orjson.loads(line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def iter_csv_chunks(lines: AsyncIterator[str], chunk_size: int) -> AsyncIterator[list]:
+    """Group CSV lines into chunks of at most chunk_size records (dicts)
+
+    The first line is the header. Quoted fields can span several lines.
+    """
+    header = None
+    records = []
+    record = None
+    async for line in lines:
+        record = line if record is None else f"{record}\n{line}"
+        # An odd number of quotes means that a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+        if header is None:
+            header = record
+        elif record.strip():
+            records.append(record)
+        record = None
+        if len(records) >= chunk_size:
+            yield parse_csv_records(header, records)
+            records = []
+    if record is not None:
+        records.append(record)
+    if records:
+        yield parse_csv_records(header, records)
+
+
+def parse_csv_records(header: str, records: List[str]) -> list:
+    """Parse CSV records into a list of dicts
+
+    If pandas is installed, column types are inferred as with pandas.read_csv,
+    otherwise all values are strings
+    """
+    text = "\n".join([header] + records)
+    if pd is not None:
+        return pd.read_csv(io.StringIO(text)).to_dict(orient="records")
+    return list(csv.DictReader(io.StringIO(text)))
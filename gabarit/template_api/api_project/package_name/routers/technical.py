@@ -15,8 +15,10 @@
 
 
 from fastapi import APIRouter
+from starlette.responses import Response
 
 from ..core.config import settings
+from ..core.metrics import render_metrics
 from ..core.resources import RESOURCES, RESOURCE_MODEL
 from ..model.model_base import Model
 from .schemas.technical import ReponseInformation, ReponseLiveness, ReponseReadiness
@@ -68,3 +70,18 @@ async def info() -> ReponseInformation:
         model_name=model._model_conf.get("model_name", "?"),
         model_version=model._model_conf.get("package_version", "?"),
     )
+
+
+@router.get(
+    "/metrics",
+    name="metrics",
+    tags=["technical"],
+)
+async def get_metrics():
+    """Prometheus metrics
+
+    Inference metrics (see {{package_name}}.core.metrics) are only recorded when
+    METRICS_ENABLED is set
+    """
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
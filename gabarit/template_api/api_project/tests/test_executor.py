@@ -0,0 +1,91 @@
+# Copyright (C) <2018-2022>  <Agence Data Services, DSI Pôle Emploi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+import threading
+
+import pytest
+
+from {{package_name}}.core.executor import ExecutorBusyError, InferenceExecutor
+from {{package_name}}.model.model_base import Model
+
+
+class BlockingModel:
+    """Model whose predictions wait for an event"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.thread_names = []
+
+    def predict(self, content, **kwargs):
+        self.thread_names.append(threading.current_thread().name)
+        self.event.wait(timeout=5)
+        return content
+
+
+def test_executor_unknown_kind():
+    """An unknown executor kind raises a ValueError"""
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind="gpu")
+
+
+def test_executor_thread():
+    """Inferences run in the thread pool, outside of the event loop"""
+    model = BlockingModel()
+    model.event.set()
+    executor = InferenceExecutor(kind="thread", max_workers=1)
+    executor.start(model)
+    try:
+        assert asyncio.run(executor.run("predict", content=["gab"])) == ["gab"]
+        assert model.thread_names[0].startswith("inference")
+        assert executor.pending == 0
+    finally:
+        executor.stop()
+
+
+def test_executor_busy():
+    """An ExecutorBusyError is raised when too many inferences are pending"""
+    model = BlockingModel()
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue_size=1)
+    executor.start(model)
+
+    async def run_inferences():
+        first = asyncio.create_task(executor.run("predict", content=[1]))
+        second = asyncio.create_task(executor.run("predict", content=[2]))
+        await asyncio.sleep(0.05)
+        assert executor.pending == 2
+        with pytest.raises(ExecutorBusyError):
+            await executor.run("predict", content=[3])
+        model.event.set()
+        return await asyncio.gather(first, second)
+
+    try:
+        assert asyncio.run(run_inferences()) == [[1], [2]]
+    finally:
+        executor.stop()
+
+
+def test_executor_process():
+    """Each process of the pool loads its own model"""
+    model = Model()
+    model.loading()
+    executor = InferenceExecutor(kind="process", max_workers=1)
+    executor.start(model)
+    try:
+        prediction = asyncio.run(executor.run("predict", content=["gabarit"]))
+        assert prediction == [{"probability": 1}]
+    finally:
+        executor.stop()
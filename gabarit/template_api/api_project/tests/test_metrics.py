@@ -0,0 +1,45 @@
+# Copyright (C) <2018-2022>  <Agence Data Services, DSI Pôle Emploi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from prometheus_client import REGISTRY
+
+from {{package_name}}.core import metrics
+from {{package_name}}.core.config import settings
+
+
+def _stage_count(stage: str) -> float:
+    return REGISTRY.get_sample_value("inference_stage_duration_seconds_count", {"stage": stage}) or 0
+
+
+def test_stage_timer(monkeypatch):
+    """Stages are only recorded when metrics are enabled"""
+    monkeypatch.setattr(settings, "metrics_enabled", False)
+    with metrics.stage_timer("test_stage"):
+        pass
+    assert _stage_count("test_stage") == 0
+
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+    with metrics.stage_timer("test_stage"):
+        pass
+    assert _stage_count("test_stage") == 1
+
+
+def test_render_metrics():
+    """The exposition contains the inference metrics once they are created"""
+    metrics.get_metrics()
+    content, media_type = metrics.render_metrics()
+    assert media_type.startswith("text/plain")
+    assert b"inference_stage_duration_seconds" in content
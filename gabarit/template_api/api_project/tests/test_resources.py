@@ -0,0 +1,86 @@
+# Copyright (C) <2018-2022>  <Agence Data Services, DSI Pôle Emploi>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import asyncio
+
+import pytest
+
+from {{package_name}}.core.resources import PredictionBatcher
+from .create_test_model import TestModel
+
+
+class CountingModel:
+    """Wrap a TestModel and record the content of each predict call"""
+
+    def __init__(self):
+        self.calls = []
+        self._model = TestModel()
+
+    def predict(self, content, **kwargs):
+        self.calls.append(content)
+        return self._model.predict(content, **kwargs)
+
+
+async def _predict_concurrently(batcher: PredictionBatcher, contents: list) -> list:
+    await batcher.start()
+    try:
+        return await asyncio.gather(*[batcher.predict(content) for content in contents])
+    finally:
+        await batcher.stop()
+
+
+def test_batcher_accepts():
+    """Only {"content": [...]} bodies can be batched"""
+    assert PredictionBatcher.accepts({"content": ["gab"]})
+    assert not PredictionBatcher.accepts({"content": "gab"})
+    assert not PredictionBatcher.accepts({"content": ["gab"], "other": 1})
+    assert not PredictionBatcher.accepts([])
+
+
+def test_batcher_coalesces_requests():
+    """Concurrent requests are predicted at once and results are scattered back"""
+    model = CountingModel()
+    batcher = PredictionBatcher(model, max_batch_size=10, max_wait_ms=50)
+    contents = [["gab"], ["gabarit", "gab"], ["toto"]]
+
+    results = asyncio.run(_predict_concurrently(batcher, contents))
+
+    assert model.calls == [["gab", "gabarit", "gab", "toto"]]
+    assert results == [TestModel().predict(content) for content in contents]
+
+
+def test_batcher_max_batch_size():
+    """A batch is processed as soon as max_batch_size inputs are pending"""
+    model = CountingModel()
+    batcher = PredictionBatcher(model, max_batch_size=2, max_wait_ms=50)
+    contents = [["a"], ["b"], ["c"], ["d"], ["e"]]
+
+    results = asyncio.run(_predict_concurrently(batcher, contents))
+
+    assert model.calls == [["a", "b"], ["c", "d"], ["e"]]
+    assert results == [TestModel().predict(content) for content in contents]
+
+
+def test_batcher_errors():
+    """An error in the model is propagated to every caller of the batch"""
+
+    class WrongModel:
+        def predict(self, content, **kwargs):
+            return [0]
+
+    batcher = PredictionBatcher(WrongModel(), max_batch_size=10, max_wait_ms=50)
+    with pytest.raises(ValueError):
+        asyncio.run(_predict_concurrently(batcher, [["a"], ["b"]]))
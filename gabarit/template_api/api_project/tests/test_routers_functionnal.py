@@ -14,10 +14,19 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
+import json
+
 import pytest
 from fastapi.testclient import TestClient
-from .create_test_model import TestExplainer
-from {{package_name}}.core.resources import RESOURCES, RESOURCE_MODEL
+from .create_test_model import TestExplainer, TestModel
+from {{package_name}}.core.resources import RESOURCES, RESOURCE_MODEL, RESOURCE_BATCHER, RESOURCE_EXECUTOR
+
+
+class CSVTestModel(TestModel):
+    """TestModel predicting the text of CSV records"""
+
+    def predict(self, content, **kwargs) -> list:
+        return super().predict([record["text"] for record in content], **kwargs)
 
 
 def test_predict(test_complete_client: TestClient):
@@ -31,6 +40,98 @@ def test_predict(test_complete_client: TestClient):
         {"probability": 1},
     ]
 
+
+def test_predict_batch(test_complete_client: TestClient):
+    """Test the route predict/batch with NDJSON and CSV bodies"""
+    # NDJSON body
+    response = test_complete_client.post(
+        "/tests/predict/batch?chunk_size=2",
+        content='"gab"\n"gabarit"\n\n"toto"\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"probability": pytest.approx(3 / 7)},
+        {"probability": 1},
+        {"probability": 0},
+    ]
+
+    # CSV body : the TestModel predicts the first value of each record
+    RESOURCES[RESOURCE_MODEL]._model = CSVTestModel()
+    response = test_complete_client.post(
+        "/tests/predict/batch?chunk_size=2",
+        content='text,other\ngab,1\n"gab\narit",2\r\ngabarit,3\n',
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"probability": pytest.approx(3 / 7)},
+        {"probability": pytest.approx(3 / 8)},
+        {"probability": 1},
+    ]
+
+    # Errors are reported in the last line
+    response = test_complete_client.post(
+        "/tests/predict/batch",
+        content='"gab"\nnot json\n',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])["error"]["code"] == 500
+
+
+def test_predict_busy(test_complete_client: TestClient, monkeypatch):
+    """Test the routes predict and explain when too many inferences are pending"""
+    from {{package_name}}.core.executor import ExecutorBusyError
+
+    async def run(*args, **kwargs):
+        raise ExecutorBusyError()
+
+    monkeypatch.setattr(RESOURCES[RESOURCE_EXECUTOR], "run", run)
+
+    response = test_complete_client.post("/tests/predict", json={"content": ["gab"]})
+    assert response.status_code == 503
+    assert response.json()["error"]["code"] == 503
+
+    response = test_complete_client.post(
+        "/tests/explain",
+        json={"content": ["gab"]},
+        headers={"Accept": "application/json"},
+    )
+    assert response.status_code == 503
+
+    response = test_complete_client.post("/tests/explain", json={"content": ["gab"]})
+    assert response.status_code == 503
+
+
+def test_predict_batching(monkeypatch):
+    """Test the route predict when the micro-batching is enabled"""
+    from {{package_name}}.core import resources
+    from {{package_name}}.model.model_base import Model
+    from {{package_name}}.application import app
+
+    monkeypatch.setattr(resources, "Model", Model)
+    monkeypatch.setattr(resources.settings, "batching_enabled", True)
+
+    with TestClient(app) as client:
+        assert isinstance(RESOURCES[RESOURCE_BATCHER], resources.PredictionBatcher)
+
+        response = client.post("/tests/predict", json={"content": ["gab", "gabarit"]})
+        assert response.status_code == 200
+        assert response.json() == [
+            {"probability": pytest.approx(3 / 7)},
+            {"probability": 1},
+        ]
+
+        # Bodies that can not be batched are directly predicted
+        response = client.post("/tests/predict", json={"content": "gabarit"})
+        assert response.status_code == 200
+        assert response.json() == [{"probability": 1}]
+
+    assert RESOURCE_BATCHER not in RESOURCES
+
+
 def test_explain(test_complete_client: TestClient):
     """Test the route explain"""
     # 501 HTML error
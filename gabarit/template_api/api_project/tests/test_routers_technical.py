@@ -43,3 +43,21 @@ def test_info(test_complete_client: TestClient):
     response = test_complete_client.get("/tests/info")
     assert response.status_code == 200
     assert response.json()["application"] == "APP_TESTS"
+
+
+def test_metrics(test_complete_client: TestClient, monkeypatch):
+    """Test the technical route /metrics"""
+    from {{package_name}}.core.config import settings
+
+    monkeypatch.setattr(settings, "metrics_enabled", True)
+
+    response = test_complete_client.post("/tests/predict", json={"content": ["gab"]})
+    assert response.status_code == 200
+
+    response = test_complete_client.get("/tests/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for stage in ("parse", "inference", "serialization"):
+        assert 'inference_stage_duration_seconds_count{stage="' + stage + '"}' in response.text
+    assert 'inference_requests_total{method="predict",status="success"}' in response.text
+    assert "inference_requests_inflight 0.0" in response.text
@@ -39,3 +39,42 @@ def test_numpy_encoder():
 
     with pytest.raises(TypeError):
         assert orjson.dumps(str)
+
+
+def test_fast_numpy_json_response():
+    """Test the FastNumpyJSONResponse that lets orjson serialize numpy objects natively"""
+    import pandas as pd
+
+    def render(obj):
+        return functional.FastNumpyJSONResponse(obj).body.decode("utf-8")
+
+    probas = np.array([[0.1, 0.9], [0.75, 0.25]])
+    assert render(probas) == "[[0.1,0.9],[0.75,0.25]]"
+    # Non contiguous arrays and unsupported dtypes
+    assert render(probas[:, 1]) == "[0.9,0.25]"
+    assert render(probas.T) == "[[0.1,0.75],[0.9,0.25]]"
+    assert render(np.array([0.1, 0.2], dtype=np.longdouble)) == "[0.1,0.2]"
+    assert render(np.array(["a", "b"])) == '["a","b"]'
+    # Numpy scalars, sets and non str keys
+    assert render({"proba": np.float64(0.5), "label": np.int16(2)}) == '{"proba":0.5,"label":2}'
+    assert render({1: 0.5}) == '{"1":0.5}'
+    assert render({0.1, 0.2}) in ("[0.1,0.2]", "[0.2,0.1]")
+    # Pandas objects
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    assert render(df) == '[{"a":1,"b":"x"},{"a":2,"b":"y"}]'
+    assert render(df["a"]) == "[1,2]"
+
+    # Fallback to the default encoder
+    with pytest.raises(TypeError):
+        render(str)
+
+
+def test_get_json_response_class(monkeypatch):
+    """Test the selection of the JSONResponse class thanks to the settings"""
+    from {{package_name}}.core.config import settings
+
+    monkeypatch.setattr(settings, "response_encoder", "default")
+    assert functional.get_json_response_class() is functional.NumpyJSONResponse
+
+    monkeypatch.setattr(settings, "response_encoder", "fast")
+    assert functional.get_json_response_class() is functional.FastNumpyJSONResponse
@@ -421,9 +421,9 @@ def ndarray_to_builtin_object(obj: Any) -> Any:
     '''
     if is_ndarray_convertable(obj):
         if np.issubdtype(obj.dtype, np.integer):
-            return obj.astype(int).tolist()
+            return obj.astype(int, copy=False).tolist()
         elif np.issubdtype(obj.dtype, np.number):
-            return obj.astype(float).tolist()
+            return obj.astype(float, copy=False).tolist()
         else:
             return obj.tolist()
     else: